@@ -0,0 +1,20 @@
+"""
+Gunicorn settings for serving the ML API with multiple uvicorn workers.
+
+Usage:
+    MALLOC_ARENA_MAX=2 gunicorn -c gunicorn_conf.py main:app
+
+MALLOC_ARENA_MAX must be set in the environment before gunicorn starts;
+it keeps glibc from creating per-thread arenas that dirty shared pages.
+"""
+
+import os
+
+bind = os.getenv("ML_API_BIND", "127.0.0.1:8000")
+workers = int(os.getenv("WEB_CONCURRENCY", os.cpu_count() or 1))
+worker_class = "uvicorn.workers.UvicornWorker"
+
+# Import main.py (LangChain, bs4, httpx, ...) once in the master so the forked
+# workers share those pages copy-on-write. The agent and its HTTP clients are
+# still created per worker in the FastAPI lifespan hook, after the fork.
+preload_app = True
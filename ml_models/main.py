@@ -1,23 +1,32 @@
-from fastapi import FastAPI, HTTPException
-from pydantic import BaseModel
-from typing import Optional
+import asyncio
 import os
+import time
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import asynccontextmanager
+from typing import Optional
+
+from anyio import to_thread
+from fastapi import FastAPI, HTTPException, Header, Request
+from pydantic import BaseModel, ConfigDict, Field, ValidationError
 
 from react_agent import (
     ReactAgent,
     ProductContext as AgentProductContext,
     create_agent,
+    get_scraper,
 )
 
 
-app = FastAPI(title="ML Models API")
-
-
 # =============================================================================
 # Request / Response Models
 # =============================================================================
 
-class ProductContext(BaseModel):
+class APIModel(BaseModel):
+    """Base for API models: unknown fields are dropped and instances are immutable."""
+    model_config = ConfigDict(extra="ignore", frozen=True)
+
+
+class ProductContext(APIModel):
     product_id: str
     product_name: Optional[str] = None  # For market trends search
     product_description: Optional[str] = None  # Detailed description for AI context
@@ -36,12 +45,12 @@ class ProductContext(BaseModel):
     cost: Optional[float] = None
 
 
-class AgentRequest(BaseModel):
+class AgentRequest(APIModel):
     query: str
     context: ProductContext
 
 
-class ToolResultResponse(BaseModel):
+class ToolResultResponse(APIModel):
     tool: str
     success: bool
     data: dict
@@ -49,7 +58,7 @@ class ToolResultResponse(BaseModel):
     error: Optional[str] = None
 
 
-class MarketTrendsResponse(BaseModel):
+class MarketTrendsResponse(APIModel):
     product: Optional[str] = None
     category: Optional[str] = None
     country: Optional[str] = None
@@ -59,7 +68,7 @@ class MarketTrendsResponse(BaseModel):
     error: Optional[str] = None
 
 
-class AgentResponse(BaseModel):
+class AgentResponse(APIModel):
     intent: str
     results: list[ToolResultResponse]
     market_trends: Optional[MarketTrendsResponse] = None
@@ -67,25 +76,121 @@ class AgentResponse(BaseModel):
     errors: list[str]
 
 
+class SubRequest(APIModel):
+    id: str
+    url: str  # Endpoint path to dispatch to, e.g. "/agent"
+    body: dict
+
+
+# Most sub-requests accepted in one /batch call
+MAX_BATCH_SIZE = 50
+
+
+class BatchRequest(APIModel):
+    requests: list[SubRequest] = Field(max_length=MAX_BATCH_SIZE)
+
+
+class SubResponse(APIModel):
+    id: str
+    status: int
+    body: dict
+
+
+class BatchResponse(APIModel):
+    responses: list[SubResponse]
+
+
 # =============================================================================
 # ReAct Agent Instance (with Gemini LLM if API key available)
 # =============================================================================
 
 # Set GOOGLE_API_KEY environment variable to enable Gemini LLM
 api_key = os.getenv("GOOGLE_API_KEY")
-agent = create_agent(use_llm=bool(api_key), api_key=api_key)
+
+# Slots in Starlette/AnyIO's shared threadpool (default 40), used for sync
+# endpoints and request plumbing
+THREADPOOL_LIMIT = 64
+
+# Threads for agent runs. Most of their time is spent waiting on blocking
+# Gemini calls, so size for I/O concurrency (the old sync endpoint allowed 40)
+AGENT_POOL_SIZE = int(os.getenv("AGENT_POOL_SIZE", "40"))
+
+
+def _build_agent() -> ReactAgent:
+    """Create the agent along with its lazily built scraper and LLM client."""
+    agent = create_agent(use_llm=bool(api_key), api_key=api_key)
+    # Touch the lazy attributes so the first request doesn't pay for them
+    _ = agent.scraper, agent.llm
+    return agent
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """Set up per-worker thread pools and build the agent at startup."""
+    to_thread.current_default_thread_limiter().total_tokens = THREADPOOL_LIMIT
+
+    # Dedicated pool for agent work (LLM calls, tool math), so a burst of
+    # agent runs can't exhaust the shared threadpool and stall /health
+    app.state.agent_pool = ThreadPoolExecutor(
+        max_workers=AGENT_POOL_SIZE,
+        thread_name_prefix="agent",
+    )
+    app.state.agent = await asyncio.to_thread(_build_agent)
+    yield
+    app.state.agent_pool.shutdown(wait=False, cancel_futures=True)
+    # The scraper is shared process-wide; close its connection pools and let
+    # a later startup build a fresh one
+    await app.state.agent.scraper.async_client.aclose()
+    app.state.agent.scraper.client.close()
+    get_scraper.cache_clear()
+
+
+app = FastAPI(title="ML Models API", lifespan=lifespan)
+
+
+# =============================================================================
+# Response Cache
+# =============================================================================
+
+# The Go backend polls the same product/query repeatedly; identical requests
+# within the TTL are answered from memory instead of re-running the agent.
+RESPONSE_CACHE_TTL = 300  # seconds
+RESPONSE_CACHE_MAX_SIZE = 10_000
+
+_response_cache: dict[str, tuple[float, AgentResponse]] = {}
+
+
+def _cache_get(key: str) -> Optional[AgentResponse]:
+    entry = _response_cache.get(key)
+    if entry is None:
+        return None
+    stored_at, value = entry
+    if time.monotonic() - stored_at > RESPONSE_CACHE_TTL:
+        del _response_cache[key]
+        return None
+    return value
+
+
+def _cache_put(key: str, value: AgentResponse) -> None:
+    _response_cache.pop(key, None)
+    if len(_response_cache) >= RESPONSE_CACHE_MAX_SIZE:
+        # Dicts keep insertion order, so the first key is the oldest entry
+        del _response_cache[next(iter(_response_cache))]
+    _response_cache[key] = (time.monotonic(), value)
 
 
 # =============================================================================
 # Agent Endpoint
 # =============================================================================
 
-@app.post("/agent", response_model=AgentResponse)
-def agent_endpoint(request: AgentRequest):
-    """
-    Single entry point for all ML queries.
-    Uses ReAct agent with LangChain + Gemini + Web Scraping for market trends.
-    """
+async def _run_agent(request: AgentRequest, app: FastAPI, skip_cache: bool = False) -> AgentResponse:
+    """Run the agent for one request, going through the response cache."""
+    cache_key = request.model_dump_json()
+    if not skip_cache:
+        cached = _cache_get(cache_key)
+        if cached is not None:
+            return cached
+
     # Convert Pydantic model to dataclass
     ctx = AgentProductContext(
         product_id=request.context.product_id,
@@ -103,24 +208,18 @@ def agent_endpoint(request: AgentRequest):
         cost=request.context.cost,
     )
 
-    # Run the agent
-    response = agent.run(request.query, ctx)
+    # Run the agent off the event loop
+    agent: ReactAgent = app.state.agent
+    response = await agent.arun(request.query, ctx, app.state.agent_pool)
 
     # Convert market trends if present
     market_trends = None
     if response.market_trends:
-        market_trends = MarketTrendsResponse(
-            product=response.market_trends.get("product"),
-            category=response.market_trends.get("category"),
-            country=response.market_trends.get("country"),
-            sentiment=response.market_trends.get("sentiment"),
-            trend_direction=response.market_trends.get("trend_direction"),
-            trends=response.market_trends.get("trends"),
-            error=response.market_trends.get("error"),
-        )
+        # Scraper-only keys (search_query, sources_checked) are ignored
+        market_trends = MarketTrendsResponse.model_validate(response.market_trends)
 
     # Convert to API response
-    return AgentResponse(
+    api_response = AgentResponse(
         intent=response.intent,
         results=[
             ToolResultResponse(
@@ -137,6 +236,79 @@ def agent_endpoint(request: AgentRequest):
         errors=response.errors,
     )
 
+    # Don't pin a failed scrape: the next request should try fetching trends
+    # again. The scraper swallows request errors and returns no headlines, so
+    # an empty trends list counts as a failure too
+    trends = response.market_trends or {}
+    scrape_failed = bool(trends.get("error")) or not trends.get("trends")
+    if not response.errors and not scrape_failed:
+        _cache_put(cache_key, api_response)
+    return api_response
+
+
+@app.post("/agent", response_model=AgentResponse)
+async def agent_endpoint(
+    request: AgentRequest,
+    http_request: Request,
+    x_skip_cache: Optional[str] = Header(default=None),
+):
+    """
+    Single entry point for all ML queries.
+    Uses ReAct agent with LangChain + Gemini + Web Scraping for market trends.
+    Send an `X-Skip-Cache` header to bypass the response cache.
+    """
+    return await _run_agent(request, http_request.app, skip_cache=bool(x_skip_cache))
+
+
+# =============================================================================
+# Batch Endpoint
+# =============================================================================
+
+# Endpoints reachable through /batch: path -> (request model, handler)
+BATCH_ROUTES = {
+    "/agent": (AgentRequest, _run_agent),
+}
+
+# Sub-requests of one batch running at once; each agent run may scrape and
+# make two Gemini calls, so a full batch must not start them all together
+BATCH_CONCURRENCY = 8
+
+
+async def _dispatch_sub_request(sub: SubRequest, app: FastAPI) -> SubResponse:
+    route = BATCH_ROUTES.get(sub.url)
+    if route is None:
+        return SubResponse(id=sub.id, status=404, body={"detail": f"Unknown url: {sub.url}"})
+
+    model, handler = route
+    try:
+        parsed = model.model_validate(sub.body)
+    except ValidationError as e:
+        errors = e.errors(include_url=False, include_context=False)
+        return SubResponse(id=sub.id, status=422, body={"detail": errors})
+
+    try:
+        result = await handler(parsed, app)
+    except Exception as e:
+        return SubResponse(id=sub.id, status=500, body={"detail": str(e)})
+    return SubResponse(id=sub.id, status=200, body=result.model_dump(mode="json"))
+
+
+@app.post("/batch", response_model=BatchResponse)
+async def batch_endpoint(request: BatchRequest, http_request: Request):
+    """
+    Run several sub-requests in one HTTP round trip.
+    Each sub-request is dispatched in-process and they run concurrently;
+    failures are reported per item instead of failing the whole batch.
+    """
+    semaphore = asyncio.Semaphore(BATCH_CONCURRENCY)
+
+    async def dispatch(sub: SubRequest) -> SubResponse:
+        async with semaphore:
+            return await _dispatch_sub_request(sub, http_request.app)
+
+    responses = await asyncio.gather(*(dispatch(sub) for sub in request.requests))
+    return BatchResponse(responses=responses)
+
 
 # =============================================================================
 # Health Check
@@ -15,14 +15,21 @@ Tools:
 - Market Trends Scraper (web scraping for recent trends)
 """
 
+import asyncio
+import copy
 import json
 import os
 import re
-import requests
-from typing import Optional, Callable, Any
-from dataclasses import dataclass, field
+import threading
+import time
+from concurrent.futures import Executor
+from dataclasses import asdict, dataclass, field, fields
 from enum import Enum
+from functools import cached_property, lru_cache, partial
 from pathlib import Path
+from typing import Optional, Callable, Any
+
+import httpx
 
 # Load environment variables from .env file
 try:
@@ -38,17 +45,42 @@ try:
 except ImportError:
     BS4_AVAILABLE = False
 
+# selectolax's C parser is much faster than bs4's html.parser; bs4 is the fallback
+try:
+    from selectolax.parser import HTMLParser
+    SELECTOLAX_AVAILABLE = True
+except ImportError:
+    SELECTOLAX_AVAILABLE = False
+
+try:
+    import orjson
+    ORJSON_AVAILABLE = True
+except ImportError:
+    ORJSON_AVAILABLE = False
+
+try:
+    import numpy as np
+    NUMPY_AVAILABLE = True
+except ImportError:
+    NUMPY_AVAILABLE = False
+
+# HTTP/2 support in httpx needs the optional h2 package
+try:
+    import h2  # noqa: F401
+    HTTP2_AVAILABLE = True
+except ImportError:
+    HTTP2_AVAILABLE = False
+
 # LangChain imports - handle newer versions
 try:
     from langchain_google_genai import ChatGoogleGenerativeAI
-    from langchain_core.messages import HumanMessage, SystemMessage
+    from langchain_core.prompts import ChatPromptTemplate
     from langchain_core.tools import Tool
     LANGCHAIN_AVAILABLE = True
 except ImportError:
     LANGCHAIN_AVAILABLE = False
     ChatGoogleGenerativeAI = None
-    HumanMessage = None
-    SystemMessage = None
+    ChatPromptTemplate = None
     Tool = None
 
 
@@ -59,6 +91,72 @@ except ImportError:
 # Set your Gemini API key in environment variable: GOOGLE_API_KEY
 GEMINI_MODEL = "gemini-1.5-flash"  # or "gemini-1.5-pro" for better quality
 
+# Shorter sales histories are summed in plain Python; below this size the
+# cost of building a NumPy array outweighs the faster reductions.
+NUMPY_MIN_HISTORY = 32
+
+# Days per moving-average window used for the demand trend
+TREND_WINDOW_DAYS = 7
+
+
+# =============================================================================
+# LLM Prompts
+# =============================================================================
+
+REASON_SYSTEM_PROMPT = """You are an AI assistant for inventory management.
+Analyze the user's query and the product context to provide reasoning about
+which tools to use and why. Consider market trends in your analysis.
+
+Available tools:
+- demand_forecast: Predict future demand
+- smart_reorder: Calculate reorder quantities
+- pricelist_optimize: Suggest pricing changes
+
+Provide a brief thought process."""
+
+REASON_CONTEXT_TEMPLATE = """
+Product: {product_id}
+Product Name: {product_name}
+Description: {description}
+Category: {category}
+Shop Country: {country}
+Current Stock: {current_stock}
+Days in Inventory: {days_in_inventory}
+Market Sentiment: {sentiment}
+Market Trend Direction: {direction}
+Recent Headlines: {headlines}
+"""
+
+SYNTHESIS_PROMPT_TEMPLATE = """Based on the following analysis results and market trends,
+provide a concise, actionable summary for the user.
+
+Query: {query}
+
+Analysis Results:
+{results}
+
+Market Trends:
+Sentiment: {sentiment}
+Direction: {direction}
+Headlines:
+{headlines}
+
+Provide a clear, professional response with specific recommendations.
+Each recommendation must include a reason (AI Explainability)."""
+
+# Parsed once at import; each LLM call only fills in the variables
+if LANGCHAIN_AVAILABLE:
+    REASON_PROMPT = ChatPromptTemplate.from_messages([
+        ("system", REASON_SYSTEM_PROMPT),
+        ("human", "Query: {query}\n\nContext:{context}"),
+    ])
+    SYNTHESIS_PROMPT = ChatPromptTemplate.from_messages([
+        ("human", SYNTHESIS_PROMPT_TEMPLATE),
+    ])
+else:
+    REASON_PROMPT = None
+    SYNTHESIS_PROMPT = None
+
 
 # =============================================================================
 # Data Models
@@ -72,7 +170,7 @@ class AgentState(Enum):
     ERROR = "error"
 
 
-@dataclass
+@dataclass(slots=True)
 class ProductContext:
     """Product data passed from Go backend."""
     product_id: str
@@ -81,7 +179,8 @@ class ProductContext:
     category: Optional[str] = None
     shop_country: Optional[str] = None  # Country code (e.g., 'US', 'UK', 'BD') for regional trends
     # Demand forecasting
-    sales_history: Optional[list[dict]] = None
+    # [{"date": ..., "qty": ...}, ...], [(date, qty), ...] or a NumPy array of quantities
+    sales_history: Optional[Any] = None
     history_months: int = 6
     # Reordering
     current_stock: Optional[int] = None
@@ -93,6 +192,9 @@ class ProductContext:
     cost: Optional[float] = None
 
 
+PRODUCT_CONTEXT_FIELDS = tuple(f.name for f in fields(ProductContext))
+
+
 @dataclass
 class ToolResult:
     """Result from a tool execution."""
@@ -124,10 +226,40 @@ class AgentResponse:
     errors: list[str] = field(default_factory=list)
 
 
+def _to_json(obj: Any) -> str:
+    """Serialize obj to a JSON string, using orjson when it is installed."""
+    if ORJSON_AVAILABLE:
+        return orjson.dumps(obj).decode()
+    return json.dumps(obj)
+
+
 # =============================================================================
 # Web Scraping for Market Trends
 # =============================================================================
 
+POSITIVE_KEYWORDS = (
+    "growth", "surge", "rising", "increase", "boom", "demand",
+    "popular", "trending", "hot", "best-selling", "record"
+)
+NEGATIVE_KEYWORDS = (
+    "decline", "drop", "falling", "decrease", "slump", "slow",
+    "weak", "struggling", "downturn", "shortage", "crisis"
+)
+
+
+def _keyword_pattern(keywords: tuple[str, ...]) -> re.Pattern:
+    """Compile a case-insensitive substring matcher for keywords."""
+    # Zero-width lookahead so overlapping keywords are all reported
+    return re.compile(
+        "(?=(" + "|".join(re.escape(kw) for kw in keywords) + "))",
+        re.IGNORECASE,
+    )
+
+
+_POSITIVE_KEYWORDS_RE = _keyword_pattern(POSITIVE_KEYWORDS)
+_NEGATIVE_KEYWORDS_RE = _keyword_pattern(NEGATIVE_KEYWORDS)
+
+
 class MarketTrendsScraper:
     """
     Scrapes web sources for recent market trends related to products.
@@ -147,9 +279,40 @@ class MarketTrendsScraper:
         },
     ]
 
+    DUCKDUCKGO_URL = "https://html.duckduckgo.com/html/"
+    CONNECTION_LIMITS = httpx.Limits(
+        max_connections=50,
+        max_keepalive_connections=20,
+        keepalive_expiry=60,  # seconds an idle connection is kept for reuse
+    )
+    GOOGLE_NEWS_RSS_URL = "https://news.google.com/rss/search"
+
+    # Headlines change slowly, so scrapes are cached per (product, category, country)
+    TRENDS_CACHE_TTL = 3600  # seconds
+    TRENDS_CACHE_MAX_SIZE = 2048
+    _trends_cache: dict[tuple, tuple[float, dict]] = {}
+    _trends_cache_lock = threading.Lock()
+
     def __init__(self):
-        self.session = requests.Session()
-        self.session.headers.update({"User-Agent": self.USER_AGENT})
+        # Pooled clients keep connections alive between scrapes; the async
+        # client serves ReactAgent.arun without blocking the event loop.
+        # httpx already sends Accept-Encoding: gzip, deflate.
+        client_kwargs = {
+            "headers": {"User-Agent": self.USER_AGENT},
+            "timeout": 10,
+            "follow_redirects": True,
+        }
+        transport_kwargs = {
+            "http2": HTTP2_AVAILABLE,
+            "limits": self.CONNECTION_LIMITS,
+            "retries": 2,  # Retries failed connects, not HTTP error statuses
+        }
+        self.client = httpx.Client(
+            transport=httpx.HTTPTransport(**transport_kwargs), **client_kwargs
+        )
+        self.async_client = httpx.AsyncClient(
+            transport=httpx.AsyncHTTPTransport(**transport_kwargs), **client_kwargs
+        )
 
     def scrape_news_trends(self, product_name: str, category: str = None, country: str = None) -> dict:
         """
@@ -161,10 +324,76 @@ class MarketTrendsScraper:
             category: Product category
             country: Country code for regional trends (e.g., 'US', 'UK', 'BD')
         """
+        key = self._cache_key(product_name, category, country)
+        cached = self._get_cached_trends(key)
+        if cached is not None:
+            return cached
+
+        trends_data = self._new_trends_data(product_name, category, country)
+
+        try:
+            # Scrape from DuckDuckGo HTML (no API key needed)
+            ddg_trends = self._scrape_duckduckgo(trends_data["search_query"])
+            self._add_trends(trends_data, "DuckDuckGo", ddg_trends)
+        except Exception as e:
+            trends_data["error"] = str(e)
+
+        return self._remember_trends(key, trends_data)
+
+    async def ascrape_news_trends(self, product_name: str, category: str = None, country: str = None) -> dict:
+        """Async variant of scrape_news_trends()."""
+        key = self._cache_key(product_name, category, country)
+        cached = self._get_cached_trends(key)
+        if cached is not None:
+            return cached
+
+        trends_data = self._new_trends_data(product_name, category, country)
+
+        try:
+            ddg_trends = await self._ascrape_duckduckgo(trends_data["search_query"])
+            self._add_trends(trends_data, "DuckDuckGo", ddg_trends)
+        except Exception as e:
+            trends_data["error"] = str(e)
+
+        return self._remember_trends(key, trends_data)
+
+    def _cache_key(self, product_name: str, category: str = None, country: str = None) -> tuple:
+        return (product_name.lower(), (category or "").lower(), (country or "").lower())
+
+    def _get_cached_trends(self, key: tuple, allow_stale: bool = False) -> Optional[dict]:
+        """Return a copy of the cached trends for key, or None if missing/expired."""
+        with self._trends_cache_lock:
+            entry = self._trends_cache.get(key)
+        if entry is None:
+            return None
+        stored_at, trends_data = entry
+        if not allow_stale and time.monotonic() - stored_at > self.TRENDS_CACHE_TTL:
+            return None
+        return copy.deepcopy(trends_data)
+
+    def _remember_trends(self, key: tuple, trends_data: dict) -> dict:
+        """
+        Cache a successful scrape. If the scrape failed or found nothing,
+        fall back to the last cached result even if it has expired.
+        """
+        if trends_data["trends"] and not trends_data["error"]:
+            with self._trends_cache_lock:
+                self._trends_cache.pop(key, None)
+                if len(self._trends_cache) >= self.TRENDS_CACHE_MAX_SIZE:
+                    # Dicts keep insertion order, so the first key is the oldest entry
+                    del self._trends_cache[next(iter(self._trends_cache))]
+                self._trends_cache[key] = (time.monotonic(), copy.deepcopy(trends_data))
+            return trends_data
+
+        stale = self._get_cached_trends(key, allow_stale=True)
+        return stale if stale is not None else trends_data
+
+    def _new_trends_data(self, product_name: str, category: str = None, country: str = None) -> dict:
+        """Build the empty trend record for a product."""
         # Build search query with regional context
         country_name = self._get_country_name(country) if country else ""
         search_query = f"{product_name} {category or ''} {country_name} market trends 2026".strip()
-        trends_data = {
+        return {
             "product": product_name,
             "category": category,
             "country": country,
@@ -176,23 +405,17 @@ class MarketTrendsScraper:
             "error": None,
         }
 
-        try:
-            # Scrape from DuckDuckGo HTML (no API key needed)
-            ddg_trends = self._scrape_duckduckgo(search_query)
-            if ddg_trends:
-                trends_data["trends"].extend(ddg_trends)
-                trends_data["sources_checked"].append("DuckDuckGo")
-
-            # Analyze sentiment from scraped headlines
-            if trends_data["trends"]:
-                sentiment, direction = self._analyze_sentiment(trends_data["trends"])
-                trends_data["sentiment"] = sentiment
-                trends_data["trend_direction"] = direction
+    def _add_trends(self, trends_data: dict, source: str, trends: list[dict]) -> None:
+        """Merge scraped headlines into trends_data and refresh the sentiment."""
+        if trends:
+            trends_data["trends"].extend(trends)
+            trends_data["sources_checked"].append(source)
 
-        except Exception as e:
-            trends_data["error"] = str(e)
-
-        return trends_data
+        # Analyze sentiment from scraped headlines
+        if trends_data["trends"]:
+            sentiment, direction = self._analyze_sentiment(trends_data["trends"])
+            trends_data["sentiment"] = sentiment
+            trends_data["trend_direction"] = direction
 
     def _get_country_name(self, country_code: str) -> str:
         """Convert country code to full name for better search results."""
@@ -218,29 +441,55 @@ class MarketTrendsScraper:
 
     def _scrape_duckduckgo(self, query: str) -> list[dict]:
         """Scrape DuckDuckGo HTML results for trend headlines."""
-        trends = []
-        if not BS4_AVAILABLE:
-            return trends
+        if not (SELECTOLAX_AVAILABLE or BS4_AVAILABLE):
+            return []
 
         try:
-            url = f"https://html.duckduckgo.com/html/?q={requests.utils.quote(query)}"
-            response = self.session.get(url, timeout=10)
+            response = self.client.get(self.DUCKDUCKGO_URL, params={"q": query})
+            return self._parse_duckduckgo(response)
+        except Exception as e:
+            return []  # Gracefully handle scraping errors
 
-            if response.status_code == 200:
-                soup = BeautifulSoup(response.text, "html.parser")
-                results = soup.select(".result__title")[:5]  # Top 5 results
+    async def _ascrape_duckduckgo(self, query: str) -> list[dict]:
+        """Async variant of _scrape_duckduckgo()."""
+        if not (SELECTOLAX_AVAILABLE or BS4_AVAILABLE):
+            return []
 
-                for result in results:
-                    link = result.select_one("a")
-                    if link:
-                        trends.append({
-                            "headline": link.get_text(strip=True),
-                            "url": link.get("href", ""),
-                            "source": "web",
-                        })
+        try:
+            response = await self.async_client.get(self.DUCKDUCKGO_URL, params={"q": query})
+            # Parsing is CPU-bound; keep it off the event loop
+            return await asyncio.to_thread(self._parse_duckduckgo, response)
         except Exception as e:
-            pass  # Gracefully handle scraping errors
+            return []  # Gracefully handle scraping errors
+
+    def _parse_duckduckgo(self, response: httpx.Response) -> list[dict]:
+        """Extract the top result headlines from a DuckDuckGo HTML page."""
+        trends = []
+        if response.status_code != 200:
+            return trends
 
+        if SELECTOLAX_AVAILABLE:
+            tree = HTMLParser(response.text)
+            for result in tree.css(".result__title")[:5]:  # Top 5 results
+                link = result.css_first("a")
+                if link is not None:
+                    trends.append({
+                        "headline": link.text(strip=True),
+                        "url": link.attributes.get("href") or "",
+                        "source": "web",
+                    })
+        else:
+            soup = BeautifulSoup(response.text, "html.parser")
+            results = soup.select(".result__title")[:5]  # Top 5 results
+
+            for result in results:
+                link = result.select_one("a")
+                if link:
+                    trends.append({
+                        "headline": link.get_text(strip=True),
+                        "url": link.get("href", ""),
+                        "source": "web",
+                    })
         return trends
 
     def _scrape_google_news_rss(self, query: str) -> list[dict]:
@@ -250,8 +499,8 @@ class MarketTrendsScraper:
             return trends
 
         try:
-            url = f"https://news.google.com/rss/search?q={requests.utils.quote(query)}&hl=en-US&gl=US&ceid=US:en"
-            response = self.session.get(url, timeout=10)
+            params = {"q": query, "hl": "en-US", "gl": "US", "ceid": "US:en"}
+            response = self.client.get(self.GOOGLE_NEWS_RSS_URL, params=params)
 
             if response.status_code == 200:
                 soup = BeautifulSoup(response.text, "xml")
@@ -279,26 +528,14 @@ class MarketTrendsScraper:
         Simple sentiment analysis based on keyword matching.
         Returns (sentiment, trend_direction).
         """
-        positive_keywords = [
-            "growth", "surge", "rising", "increase", "boom", "demand",
-            "popular", "trending", "hot", "best-selling", "record"
-        ]
-        negative_keywords = [
-            "decline", "drop", "falling", "decrease", "slump", "slow",
-            "weak", "struggling", "downturn", "shortage", "crisis"
-        ]
-
         positive_count = 0
         negative_count = 0
 
         for trend in trends:
-            headline = trend.get("headline", "").lower()
-            for kw in positive_keywords:
-                if kw in headline:
-                    positive_count += 1
-            for kw in negative_keywords:
-                if kw in headline:
-                    negative_count += 1
+            headline = trend.get("headline", "")
+            # Each keyword counts once per headline, as with a substring check
+            positive_count += len({m.lower() for m in _POSITIVE_KEYWORDS_RE.findall(headline)})
+            negative_count += len({m.lower() for m in _NEGATIVE_KEYWORDS_RE.findall(headline)})
 
         if positive_count > negative_count:
             return "positive", "upward"
@@ -308,71 +545,323 @@ class MarketTrendsScraper:
             return "neutral", "stable"
 
 
+@lru_cache(maxsize=1)
+def get_scraper() -> MarketTrendsScraper:
+    """Return the process-wide scraper so all agents share its connection pools."""
+    return MarketTrendsScraper()
+
+
 # =============================================================================
 # Tool Implementations
 # =============================================================================
 
-def demand_forecast_tool(ctx: ProductContext, market_trends: dict = None) -> ToolResult:
+# Market-trend adjustments per trend_direction, looked up once per tool call.
+# Demand forecast: (forecast change %, insight)
+FORECAST_TREND_ADJUSTMENTS = {
+    "upward": (10, "Market trends indicate rising demand."),
+    "downward": (-10, "Market trends indicate declining demand."),
+}
+FORECAST_TREND_STABLE = (0, "Market trends are stable.")
+
+# Smart reorder: (daily demand multiplier, note)
+REORDER_TREND_ADJUSTMENTS = {
+    "upward": (1.15, "Increased buffer for rising market demand."),
+    "downward": (0.9, "Reduced buffer for declining market demand."),
+}
+
+# Pricelist: (markdown change in points, note). Rising demand only softens an
+# existing markdown; declining demand deepens any action other than no_change.
+PRICE_TREND_ADJUSTMENTS = {
+    "upward": (-5, "Reduced markdown due to rising market demand."),
+    "downward": (5, "Increased markdown due to declining market trends."),
+}
+MAX_MARKDOWN_PCT = 35
+
+
+def _extract_qty(sales_history: Any, as_array: bool) -> Any:
     """
-    Demand Forecasting Engine
-    Uses historical sales data + market trends to predict future demand.
+    Pull daily quantities out of a sales history in one pass.
+    Accepts a list of {"qty": ...} dicts, a list of (date, qty) tuples, a 1-D
+    array of quantities or a structured array with a "qty" field. Returns a
+    float64 array when `as_array` is set, otherwise a list.
+
+    NumPy would coerce None to NaN and "5" to 5.0, so a list whose values are
+    not all numbers gives None for `as_array`; summing the list instead
+    raises the same TypeError as for short histories.
     """
-    history_months = ctx.history_months or 6
-    sales_history = ctx.sales_history or []
-
-    # Calculate forecast from historical data
-    if sales_history:
-        total_qty = sum(item.get("qty", 0) for item in sales_history)
-        avg_daily = total_qty / max(len(sales_history), 1)
-        forecast_weekly = avg_daily * 7
-
-        if len(sales_history) >= 2:
-            recent = sum(item.get("qty", 0) for item in sales_history[-7:])
-            older = sum(item.get("qty", 0) for item in sales_history[:7])
-            trend_pct = ((recent - older) / max(older, 1)) * 100
-        else:
-            trend_pct = 0
+    if NUMPY_AVAILABLE and isinstance(sales_history, np.ndarray):
+        if sales_history.dtype.names:
+            sales_history = sales_history["qty"]
+        if sales_history.dtype.kind not in "biuf":
+            raise TypeError(f"sales_history quantities must be numeric, got dtype {sales_history.dtype}")
+        qtys = sales_history.astype(np.float64, copy=False)
+        return qtys if as_array else qtys.tolist()
+
+    first = sales_history[0]
+    if isinstance(first, dict):
+        values = [item.get("qty", 0) for item in sales_history]
     else:
-        forecast_weekly = 150
-        trend_pct = 12.0
-
-    # Adjust forecast based on market trends
-    market_adjustment = 0
-    market_insight = ""
-    if market_trends and market_trends.get("trend_direction"):
-        direction = market_trends["trend_direction"]
-        if direction == "upward":
-            market_adjustment = 10  # Increase forecast by 10%
-            market_insight = "Market trends indicate rising demand."
-        elif direction == "downward":
-            market_adjustment = -10  # Decrease forecast by 10%
-            market_insight = "Market trends indicate declining demand."
-        else:
-            market_insight = "Market trends are stable."
+        values = [item[1] for item in sales_history]
+
+    if as_array:
+        qtys = np.array(values)
+        if qtys.dtype.kind not in "biuf":
+            return None
+        return qtys.astype(np.float64, copy=False)
+    return values
+
+
+# Forecast used when a product has no sales history yet
+DEFAULT_FORECAST_WEEKLY = 150
+DEFAULT_TREND_PCT = 12.0
+
+
+def _forecast_summary(
+    product_id: str,
+    history_months: int,
+    forecast_weekly: float,
+    trend_pct: float,
+    direction: Optional[str],
+    sentiment: Optional[str],
+    has_market_trends: bool,
+) -> tuple[dict, str]:
+    """Apply the market adjustment and build the forecast data and explanation."""
+    if direction:
+        market_adjustment, market_insight = FORECAST_TREND_ADJUSTMENTS.get(direction, FORECAST_TREND_STABLE)
+    else:
+        market_adjustment, market_insight = 0, ""
 
     adjusted_forecast = forecast_weekly * (1 + market_adjustment / 100)
     trend_direction = "upward" if trend_pct > 0 else "downward" if trend_pct < 0 else "stable"
 
     data = {
-        "product_id": ctx.product_id,
+        "product_id": product_id,
         "forecast_units_per_week": round(adjusted_forecast, 1),
         "base_forecast": round(forecast_weekly, 1),
         "market_adjustment_pct": market_adjustment,
         "trend_percent": round(abs(trend_pct), 1),
         "trend_direction": trend_direction,
         "forecast_horizon_weeks": 4,
-        "confidence": 0.85 if not market_trends else 0.88,
+        "confidence": 0.88 if has_market_trends else 0.85,
         "model_used": "moving_average_with_trends",
-        "market_sentiment": market_trends.get("sentiment") if market_trends else None,
+        "market_sentiment": sentiment,
     }
 
+    market_note = (
+        f"{market_insight} Adjusted forecast: {adjusted_forecast:.1f} units/week. "
+        if market_insight else ""
+    )
     explanation = (
         f"Based on {history_months}-month sales history, base forecast is "
         f"{forecast_weekly:.1f} units/week with a {abs(trend_pct):.1f}% {trend_direction} trend. "
+        f"{market_note}Confidence: {data['confidence']*100:.0f}%."
+    )
+    return data, explanation
+
+
+@lru_cache(maxsize=1024)
+def _default_forecast_summary(
+    product_id: str,
+    history_months: int,
+    direction: Optional[str],
+    sentiment: Optional[str],
+    has_market_trends: bool,
+) -> tuple[dict, str]:
+    """Cached summary for products without sales history; callers must copy the dict."""
+    return _forecast_summary(
+        product_id, history_months, DEFAULT_FORECAST_WEEKLY, DEFAULT_TREND_PCT,
+        direction, sentiment, has_market_trends,
+    )
+
+
+def _forecast_stats(sales_history: Any) -> Optional[tuple[float, float]]:
+    """Return (forecast_weekly, trend_pct) for a sales history, or None if it is empty."""
+    n = len(sales_history) if sales_history is not None else 0
+    if not n:
+        return None
+
+    # Compare the moving average of the oldest and newest windows; the
+    # window shrinks for short histories so the two never overlap
+    window = min(TREND_WINDOW_DAYS, n // 2)
+
+    is_array = NUMPY_AVAILABLE and isinstance(sales_history, np.ndarray)
+    qtys = None
+    if NUMPY_AVAILABLE and (is_array or n >= NUMPY_MIN_HISTORY):
+        qtys = _extract_qty(sales_history, as_array=True)
+
+    if qtys is not None:
+        total_qty = float(qtys.sum())
+        recent = float(qtys[n - window:].sum())
+        older = float(qtys[:window].sum())
+    else:
+        qtys = _extract_qty(sales_history, as_array=False)
+        total_qty = sum(qtys)
+        recent = sum(qtys[n - window:])
+        older = sum(qtys[:window])
+
+    avg_daily = total_qty / max(n, 1)
+    forecast_weekly = avg_daily * 7
+
+    if window:
+        # Percent change between the window means; dividing both sums by
+        # `window` cancels out, leaving the sums with a floor of one unit/day
+        trend_pct = ((recent - older) / max(older, window)) * 100
+    else:
+        trend_pct = 0
+    return forecast_weekly, trend_pct
+
+
+def _forecast_stats_batch(histories: list) -> list[Optional[tuple[float, float]]]:
+    """
+    _forecast_stats() for many sales histories at once.
+    Histories long enough for the NumPy path are zero-padded into one matrix
+    and reduced together; shorter ones go through _forecast_stats() so every
+    product gets exactly the numbers process_request would compute.
+    """
+    stats: list[Optional[tuple[float, float]]] = [None] * len(histories)
+    long_rows, long_qtys = [], []
+    for row, history in enumerate(histories):
+        try:
+            if NUMPY_AVAILABLE and history is not None and len(history) >= NUMPY_MIN_HISTORY:
+                qtys = _extract_qty(history, as_array=True)
+                if qtys is not None:
+                    long_rows.append(row)
+                    long_qtys.append(qtys)
+                    continue
+            stats[row] = _forecast_stats(history)
+        except Exception:
+            # Malformed history: leave None so demand_forecast_tool recomputes
+            # it and the error is reported for this product only, as
+            # process_request would
+            pass
+    if not long_rows:
+        return stats
+
+    lengths = np.array([len(qtys) for qtys in long_qtys], dtype=np.intp)
+    # Totals are summed per row: the zero padding would change how
+    # qty_matrix.sum(axis=1) pairs terms, and with it the float rounding
+    totals = np.array([qtys.sum() for qtys in long_qtys])
+    qty_matrix = np.zeros((len(long_rows), int(lengths.max())))
+    for i, qtys in enumerate(long_qtys):
+        qty_matrix[i, :lengths[i]] = qtys
+
+    core = _forecast_core_batch_jit() or _forecast_core_batch
+    forecast_weekly, trend_pct = core(qty_matrix, lengths, totals, TREND_WINDOW_DAYS)
+    for row, weekly, pct in zip(long_rows, forecast_weekly.tolist(), trend_pct.tolist()):
+        stats[row] = (weekly, pct)
+    return stats
+
+
+def _forecast_core_batch(qty_matrix, lengths, totals, window: int):
+    """
+    Vectorized forecast_weekly and trend_pct for zero-padded rows of daily
+    quantities, each at least 2 * window long, given each row's total.
+    Window sums are taken in the same order as the NumPy path of
+    _forecast_stats(), so results are identical.
+    """
+    rows = np.arange(qty_matrix.shape[0])
+
+    # Accumulate the windows column by column: left to right, like qtys[:window].sum()
+    recent_cols = lengths[:, None] - window + np.arange(window)
+    recent_matrix = qty_matrix[rows[:, None], recent_cols]
+    older = np.zeros(len(rows))
+    recent = np.zeros(len(rows))
+    for col in range(window):
+        older += qty_matrix[:, col]
+        recent += recent_matrix[:, col]
+
+    forecast_weekly = totals / lengths * 7
+    trend_pct = (recent - older) / np.maximum(older, window) * 100
+    return forecast_weekly, trend_pct
+
+
+def _forecast_core_batch_loops(qty_matrix, lengths, totals, window):
+    """Loop form of _forecast_core_batch, compiled by Numba when it is installed."""
+    n_rows = qty_matrix.shape[0]
+    forecast_weekly = np.empty(n_rows)
+    trend_pct = np.empty(n_rows)
+    for row in range(n_rows):
+        n = lengths[row]
+        older = 0.0
+        recent = 0.0
+        for i in range(window):
+            older += qty_matrix[row, i]
+            recent += qty_matrix[row, n - window + i]
+        forecast_weekly[row] = totals[row] / n * 7
+        trend_pct[row] = (recent - older) / max(older, window) * 100
+    return forecast_weekly, trend_pct
+
+
+@lru_cache(maxsize=1)
+def _forecast_core_batch_jit() -> Optional[Callable]:
+    """
+    Numba-compiled _forecast_core_batch_loops, or None without numba.
+    numba is imported here rather than at module level, so only batch
+    callers pay for importing it and compiling the kernel.
+    """
+    try:
+        from numba import njit
+    except ImportError:
+        return None
+    # Serial on purpose: batches are small, and parallel=True doubled compile
+    # time while running slower on them
+    return njit(cache=True)(_forecast_core_batch_loops)
+
+
+def warm_up_batch_forecast() -> None:
+    """Compile the batch forecast kernel ahead of the first process_requests_batch call."""
+    core = _forecast_core_batch_jit()
+    if core is not None:
+        # Same argument types as _forecast_stats_batch passes
+        core(
+            np.zeros((1, NUMPY_MIN_HISTORY)),
+            np.full(1, NUMPY_MIN_HISTORY, dtype=np.intp),
+            np.zeros(1),
+            TREND_WINDOW_DAYS,
+        )
+
+
+def demand_forecast_tool(
+    ctx: ProductContext,
+    market_trends: dict = None,
+    forecast_stats: Optional[tuple[float, float]] = None,
+) -> ToolResult:
+    """
+    Demand Forecasting Engine
+    Uses historical sales data + market trends to predict future demand.
+    `forecast_stats` takes (forecast_weekly, trend_pct) already computed for
+    ctx.sales_history, e.g. by _forecast_stats_batch().
+    """
+    history_months = ctx.history_months or 6
+
+    if market_trends:
+        direction = market_trends.get("trend_direction")
+        sentiment = market_trends.get("sentiment")
+    else:
+        direction = sentiment = None
+
+    stats = forecast_stats
+    if stats is None:
+        stats = _forecast_stats(ctx.sales_history)
+
+    # Cold start: without history the result depends only on these inputs
+    if stats is None:
+        data, explanation = _default_forecast_summary(
+            ctx.product_id, history_months, direction, sentiment, bool(market_trends)
+        )
+        return ToolResult(
+            tool_name="demand_forecast",
+            success=True,
+            data=dict(data),
+            explanation=explanation
+        )
+
+    # Adjust forecast based on market trends
+    forecast_weekly, trend_pct = stats
+    data, explanation = _forecast_summary(
+        ctx.product_id, history_months, forecast_weekly, trend_pct,
+        direction, sentiment, bool(market_trends),
     )
-    if market_insight:
-        explanation += f"{market_insight} Adjusted forecast: {adjusted_forecast:.1f} units/week. "
-    explanation += f"Confidence: {data['confidence']*100:.0f}%."
 
     return ToolResult(
         tool_name="demand_forecast",
@@ -395,14 +884,13 @@ def smart_reorder_tool(ctx: ProductContext, market_trends: dict = None) -> ToolR
     daily_demand = 20
 
     # Adjust for market trends
-    if market_trends and market_trends.get("trend_direction") == "upward":
-        daily_demand *= 1.15  # Increase buffer for rising demand
-        trend_note = "Increased buffer for rising market demand."
-    elif market_trends and market_trends.get("trend_direction") == "downward":
-        daily_demand *= 0.9  # Reduce for declining demand
-        trend_note = "Reduced buffer for declining market demand."
+    if market_trends:
+        direction = market_trends.get("trend_direction")
+        trends = market_trends.get("trends")
     else:
-        trend_note = ""
+        direction = trends = None
+    demand_multiplier, trend_note = REORDER_TREND_ADJUSTMENTS.get(direction, (1, ""))
+    daily_demand *= demand_multiplier
 
     stock_covers_days = current_stock / daily_demand if daily_demand > 0 else 999
 
@@ -429,15 +917,16 @@ def smart_reorder_tool(ctx: ProductContext, market_trends: dict = None) -> ToolR
     else:
         urgency = "low"
 
-    # Calculate confidence based on data availability
-    confidence = 0.75  # Base confidence
-    if market_trends and market_trends.get("trends"):
-        confidence += 0.10  # Boost for market data
-    if ctx.current_stock is not None and ctx.safety_stock is not None:
-        confidence += 0.05  # Boost for complete stock data
-    if ctx.lead_time_days is not None:
-        confidence += 0.05  # Boost for lead time data
-    confidence = min(confidence, 0.95)  # Cap at 95%
+    # Calculate confidence based on data availability: each boost is scaled by
+    # a 0/1 flag, so the sum is computed in one expression without branching
+    has_market_data = bool(trends)
+    confidence = min(
+        0.75  # Base confidence
+        + 0.10 * has_market_data  # Boost for market data
+        + 0.05 * (ctx.current_stock is not None and ctx.safety_stock is not None)  # Boost for complete stock data
+        + 0.05 * (ctx.lead_time_days is not None),  # Boost for lead time data
+        0.95,  # Cap at 95%
+    )
 
     data = {
         "product_id": ctx.product_id,
@@ -459,10 +948,8 @@ def smart_reorder_tool(ctx: ProductContext, market_trends: dict = None) -> ToolR
             f"Current stock ({current_stock} units) covers only {stock_covers_days:.0f} days. "
             f"With {lead_time_days}-day lead time and {daily_demand:.0f} units/day demand, "
             f"recommend ordering {int(reorder_qty)} units. Urgency: {urgency}. "
-            f"Confidence: {confidence*100:.0f}%. "
+            f"Confidence: {confidence*100:.0f}%. {trend_note}"
         )
-        if trend_note:
-            explanation += trend_note
     else:
         explanation = (
             f"Stock levels healthy at {current_stock} units, covering {stock_covers_days:.0f} days. "
@@ -514,14 +1001,14 @@ def pricelist_optimize_tool(ctx: ProductContext, market_trends: dict = None) ->
     # Adjust based on market trends
     market_note = ""
     if market_trends:
-        if market_trends.get("trend_direction") == "upward" and markdown_pct > 0:
-            # Rising demand - less aggressive markdown
-            markdown_pct = max(0, markdown_pct - 5)
-            market_note = "Reduced markdown due to rising market demand."
-        elif market_trends.get("trend_direction") == "downward" and suggested_action != "no_change":
-            # Declining demand - more aggressive
-            markdown_pct = min(35, markdown_pct + 5)
-            market_note = "Increased markdown due to declining market trends."
+        direction = market_trends.get("trend_direction")
+        trends = market_trends.get("trends", [])
+    else:
+        direction, trends = None, []
+    markdown_delta, note = PRICE_TREND_ADJUSTMENTS.get(direction, (0, ""))
+    if (markdown_delta < 0 and markdown_pct > 0) or (markdown_delta > 0 and suggested_action != "no_change"):
+        markdown_pct = min(MAX_MARKDOWN_PCT, max(0, markdown_pct + markdown_delta))
+        market_note = note
 
     new_price = round(current_price * (1 - markdown_pct / 100), 2) if markdown_pct else current_price
 
@@ -533,14 +1020,14 @@ def pricelist_optimize_tool(ctx: ProductContext, market_trends: dict = None) ->
     margin_new = ((new_price - cost) / new_price * 100) if new_price > 0 else 0
 
     # Calculate confidence based on data availability and market factors
-    confidence = 0.70  # Base confidence
-    if market_trends and market_trends.get("trends"):
-        confidence += 0.12  # Boost for market data
-    if ctx.days_in_inventory is not None:
-        confidence += 0.05  # Boost for aging data
-    if ctx.current_price is not None and ctx.cost is not None:
-        confidence += 0.08  # Boost for pricing data
-    confidence = min(confidence, 0.95)  # Cap at 95%
+    has_market_data = bool(trends)
+    confidence = min(
+        0.70  # Base confidence
+        + 0.12 * has_market_data  # Boost for market data
+        + 0.05 * (ctx.days_in_inventory is not None)  # Boost for aging data
+        + 0.08 * (ctx.current_price is not None and ctx.cost is not None),  # Boost for pricing data
+        0.95,  # Cap at 95%
+    )
 
     data = {
         "product_id": ctx.product_id,
@@ -555,7 +1042,7 @@ def pricelist_optimize_tool(ctx: ProductContext, market_trends: dict = None) ->
         "current_margin_pct": round(margin_current, 1),
         "projected_margin_pct": round(margin_new, 1),
         "market_adjusted": bool(market_note),
-        "market_trends_summary": market_trends.get("trends", [])[:3] if market_trends else [],
+        "market_trends_summary": trends[:3],
         "confidence": round(confidence, 2),
         "model_used": "rule_based_pricing_with_trends",
     }
@@ -573,16 +1060,13 @@ def pricelist_optimize_tool(ctx: ProductContext, market_trends: dict = None) ->
             f"Confidence: {confidence*100:.0f}%."
         )
     else:
+        bundle_note = f"Or bundle with {bundle_partner}. " if bundle_partner else ""
         explanation = (
             f"Aged {days_in_inventory} days in inventory. "
             f"Recommend {markdown_pct}% markdown (${current_price:.2f} → ${new_price:.2f}). "
             f"Margin: {margin_current:.1f}% → {margin_new:.1f}%. "
-            f"Confidence: {confidence*100:.0f}%. "
+            f"Confidence: {confidence*100:.0f}%. {bundle_note}{market_note}"
         )
-        if bundle_partner:
-            explanation += f"Or bundle with {bundle_partner}. "
-        if market_note:
-            explanation += market_note
 
     return ToolResult(
         tool_name="pricelist_optimize",
@@ -596,6 +1080,28 @@ def pricelist_optimize_tool(ctx: ProductContext, market_trends: dict = None) ->
 # LangChain ReAct Agent
 # =============================================================================
 
+FULL_ANALYSIS_TOOLS = ("demand_forecast", "smart_reorder", "pricelist_optimize")
+
+# Intent keyword vocabularies
+_KW_FULL_ANALYSIS = frozenset({"full analysis", "all", "complete", "everything"})
+_KW_FORECAST = frozenset({"demand", "forecast", "predict", "future demand"})
+_KW_REORDER = frozenset({"reorder", "stock", "replenish", "order"})
+_KW_PRICING = frozenset({"price", "pricing", "markdown", "discount", "optimize"})
+
+# Keyword groups in priority order; the first group found anywhere in the
+# query (as a substring) decides the tools. Each group carries its vocabulary
+# for a whole-word set lookup and a compiled pattern for substring matches.
+_INTENT_KEYWORD_PATTERNS = tuple(
+    (keywords, re.compile("|".join(re.escape(kw) for kw in sorted(keywords))), tools)
+    for keywords, tools in (
+        (_KW_FULL_ANALYSIS, FULL_ANALYSIS_TOOLS),
+        (_KW_FORECAST, ("demand_forecast",)),
+        (_KW_REORDER, ("smart_reorder",)),
+        (_KW_PRICING, ("pricelist_optimize",)),
+    )
+)
+
+
 class ReactAgent:
     """
     ReAct Agent using LangChain and Gemini for inventory management.
@@ -608,6 +1114,14 @@ class ReactAgent:
         "pricelist_optimize": "What's the pricelist optimization?",
         "full_analysis": "What's the full analysis?",
     }
+    _EXACT_INTENTS = {q.lower(): intent for intent, q in INTENT_QUERIES.items()}
+
+    # Tool name -> implementation, shared by run(), arun() and run_single_tool()
+    _TOOLS: dict[str, Callable[[ProductContext, Optional[dict]], ToolResult]] = {
+        "demand_forecast": demand_forecast_tool,
+        "smart_reorder": smart_reorder_tool,
+        "pricelist_optimize": pricelist_optimize_tool,
+    }
 
     def __init__(self, use_llm: bool = True, api_key: str = None):
         """
@@ -619,21 +1133,29 @@ class ReactAgent:
         """
         self.use_llm = use_llm
         self.api_key = api_key or os.getenv("GOOGLE_API_KEY")
-        self.scraper = MarketTrendsScraper()
-        self.llm = None
 
+    # The scraper and LLM are created on first access, so tool-only runs never
+    # open HTTP clients or build a Gemini client
+
+    @cached_property
+    def scraper(self) -> MarketTrendsScraper:
+        return get_scraper()
+
+    @cached_property
+    def llm(self):
+        """Gemini LLM, or None when disabled or unavailable."""
         if self.use_llm and self.api_key and LANGCHAIN_AVAILABLE:
-            self._init_llm()
+            return self._init_llm()
+        return None
 
     def _init_llm(self):
         """Initialize Gemini LLM via LangChain."""
         if not LANGCHAIN_AVAILABLE or not ChatGoogleGenerativeAI:
             print("Warning: LangChain not available")
-            self.llm = None
-            return
+            return None
 
         try:
-            self.llm = ChatGoogleGenerativeAI(
+            return ChatGoogleGenerativeAI(
                 model=GEMINI_MODEL,
                 google_api_key=self.api_key,
                 temperature=0.3,
@@ -641,17 +1163,26 @@ class ReactAgent:
             )
         except Exception as e:
             print(f"Warning: Could not initialize Gemini LLM: {e}")
-            self.llm = None
+            return None
 
     def _get_langchain_tools(self, ctx: ProductContext, market_trends: dict) -> list:
         """Create LangChain Tool objects for the agent."""
         if not LANGCHAIN_AVAILABLE or not Tool:
             return []
 
+        # Tool output depends only on ctx and market_trends, which are fixed
+        # for this tool set, so each tool runs and is serialized at most once
+        outputs: dict[str, str] = {}
+
+        def run_tool(name: str, tool_fn: Callable[..., ToolResult], _tool_input: str) -> str:
+            if name not in outputs:
+                outputs[name] = _to_json(asdict(tool_fn(ctx, market_trends)))
+            return outputs[name]
+
         return [
             Tool(
                 name="demand_forecast",
-                func=lambda x: json.dumps(demand_forecast_tool(ctx, market_trends).__dict__),
+                func=partial(run_tool, "demand_forecast", demand_forecast_tool),
                 description=(
                     "Predict future product demand using historical sales data and market trends. "
                     "Use when asked about forecasting, predictions, or future demand."
@@ -659,7 +1190,7 @@ class ReactAgent:
             ),
             Tool(
                 name="smart_reorder",
-                func=lambda x: json.dumps(smart_reorder_tool(ctx, market_trends).__dict__),
+                func=partial(run_tool, "smart_reorder", smart_reorder_tool),
                 description=(
                     "Calculate optimal reorder quantity based on stock levels and lead time. "
                     "Use when asked about reordering, replenishment, or stock levels."
@@ -667,7 +1198,7 @@ class ReactAgent:
             ),
             Tool(
                 name="pricelist_optimize",
-                func=lambda x: json.dumps(pricelist_optimize_tool(ctx, market_trends).__dict__),
+                func=partial(run_tool, "pricelist_optimize", pricelist_optimize_tool),
                 description=(
                     "Suggest price adjustments or bundles for aging inventory. "
                     "Use when asked about pricing, markdowns, discounts, or slow-moving items."
@@ -677,81 +1208,75 @@ class ReactAgent:
 
     def _classify_intent(self, query: str) -> list[str]:
         """Classify user query into tool intents using keyword matching."""
+        return list(self._classify_query(query))
+
+    @staticmethod
+    @lru_cache(maxsize=256)
+    def _classify_query(query: str) -> tuple[str, ...]:
+        """Cached classification; returns a tuple so cached values stay immutable."""
         query_clean = query.strip().lower()
 
         # Check for exact matches first
-        for intent, expected_query in self.INTENT_QUERIES.items():
-            if query_clean == expected_query.lower():
-                if intent == "full_analysis":
-                    return ["demand_forecast", "smart_reorder", "pricelist_optimize"]
-                return [intent]
-
-        # Keyword-based matching for flexibility
-        if any(kw in query_clean for kw in ["full analysis", "all", "complete", "everything"]):
-            return ["demand_forecast", "smart_reorder", "pricelist_optimize"]
-
-        if any(kw in query_clean for kw in ["demand", "forecast", "predict", "future demand"]):
-            return ["demand_forecast"]
-
-        if any(kw in query_clean for kw in ["reorder", "stock", "replenish", "order"]):
-            return ["smart_reorder"]
-
-        if any(kw in query_clean for kw in ["price", "pricing", "markdown", "discount", "optimize"]):
-            return ["pricelist_optimize"]
+        intent = ReactAgent._EXACT_INTENTS.get(query_clean)
+        if intent == "full_analysis":
+            return FULL_ANALYSIS_TOOLS
+        if intent:
+            return (intent,)
+
+        # Keyword-based matching for flexibility. A whole-word hit is a
+        # substring hit too, so the set lookup only skips the regex scan.
+        tokens = frozenset(query_clean.split())
+        for keywords, pattern, tools in _INTENT_KEYWORD_PATTERNS:
+            if not tokens.isdisjoint(keywords) or pattern.search(query_clean):
+                return tools
 
         # Default to demand forecast only (not all 3)
-        return ["demand_forecast"]
+        return ("demand_forecast",)
 
-    def _fetch_market_trends(self, ctx: ProductContext) -> dict:
-        """Fetch market trends via web scraping."""
+    def _trend_search_args(self, ctx: ProductContext) -> tuple[str, Optional[str], Optional[str]]:
+        """Build the (product_name, category, country) used for trend scraping."""
         # Use product description for better search if available
         product_name = ctx.product_name or ctx.product_id
         if ctx.product_description:
             # Extract key terms from description for better search
             product_name = f"{product_name} {ctx.product_description[:50]}"
-        category = ctx.category
-        country = ctx.shop_country
+        return product_name, ctx.category, ctx.shop_country
 
+    def _fetch_market_trends(self, ctx: ProductContext) -> dict:
+        """Fetch market trends via web scraping."""
         try:
-            trends = self.scraper.scrape_news_trends(product_name, category, country)
+            trends = self.scraper.scrape_news_trends(*self._trend_search_args(ctx))
             return trends
         except Exception as e:
             return {"error": str(e), "trends": []}
 
+    async def _afetch_market_trends(self, ctx: ProductContext) -> dict:
+        """Async variant of _fetch_market_trends()."""
+        try:
+            return await self.scraper.ascrape_news_trends(*self._trend_search_args(ctx))
+        except Exception as e:
+            return {"error": str(e), "trends": []}
+
     def _reason_with_llm(self, query: str, ctx: ProductContext, market_trends: dict) -> str:
         """Use Gemini to reason about the query."""
         if not self.llm:
             return "LLM not available, using rule-based reasoning."
 
-        system_prompt = """You are an AI assistant for inventory management.
-        Analyze the user's query and the product context to provide reasoning about
-        which tools to use and why. Consider market trends in your analysis.
-
-        Available tools:
-        - demand_forecast: Predict future demand
-        - smart_reorder: Calculate reorder quantities
-        - pricelist_optimize: Suggest pricing changes
-
-        Provide a brief thought process."""
-
-        context_str = f"""
-        Product: {ctx.product_id}
-        Product Name: {ctx.product_name}
-        Description: {ctx.product_description or 'N/A'}
-        Category: {ctx.category}
-        Shop Country: {ctx.shop_country or 'Global'}
-        Current Stock: {ctx.current_stock}
-        Days in Inventory: {ctx.days_in_inventory}
-        Market Sentiment: {market_trends.get('sentiment', 'unknown')}
-        Market Trend Direction: {market_trends.get('trend_direction', 'unknown')}
-        Recent Headlines: {[t.get('headline', '')[:50] for t in market_trends.get('trends', [])[:3]]}
-        """
+        context_str = REASON_CONTEXT_TEMPLATE.format(
+            product_id=ctx.product_id,
+            product_name=ctx.product_name,
+            description=ctx.product_description or 'N/A',
+            category=ctx.category,
+            country=ctx.shop_country or 'Global',
+            current_stock=ctx.current_stock,
+            days_in_inventory=ctx.days_in_inventory,
+            sentiment=market_trends.get('sentiment', 'unknown'),
+            direction=market_trends.get('trend_direction', 'unknown'),
+            headlines=[t.get('headline', '')[:50] for t in market_trends.get('trends', [])[:3]],
+        )
 
         try:
-            messages = [
-                SystemMessage(content=system_prompt),
-                HumanMessage(content=f"Query: {query}\n\nContext:{context_str}"),
-            ]
+            messages = REASON_PROMPT.format_messages(query=query, context=context_str)
             response = self.llm.invoke(messages)
             return response.content
         except Exception as e:
@@ -774,25 +1299,14 @@ class ReactAgent:
                 for t in market_trends.get("trends", [])[:3]
             ])
 
-        prompt = f"""Based on the following analysis results and market trends,
-        provide a concise, actionable summary for the user.
-
-        Query: {query}
-
-        Analysis Results:
-        {results_str}
-
-        Market Trends:
-        Sentiment: {market_trends.get('sentiment', 'N/A')}
-        Direction: {market_trends.get('trend_direction', 'N/A')}
-        Headlines:
-        {trends_str or 'No recent trends found.'}
-
-        Provide a clear, professional response with specific recommendations.
-        Each recommendation must include a reason (AI Explainability)."""
-
         try:
-            messages = [HumanMessage(content=prompt)]
+            messages = SYNTHESIS_PROMPT.format_messages(
+                query=query,
+                results=results_str,
+                sentiment=market_trends.get('sentiment', 'N/A'),
+                direction=market_trends.get('trend_direction', 'N/A'),
+                headlines=trends_str or 'No recent trends found.',
+            )
             response = self.llm.invoke(messages)
             return response.content
         except Exception as e:
@@ -812,9 +1326,38 @@ class ReactAgent:
 
         return "\n".join(parts).strip()
 
-    def run(self, query: str, context: ProductContext) -> AgentResponse:
+    def _think(self, query: str, context: ProductContext, market_trends: dict, intents: list[str]) -> str:
+        """Produce the reasoning step (with LLM if available)."""
+        if self.use_llm and self.llm:
+            return self._reason_with_llm(query, context, market_trends)
+        return f"Processing query for tools: {', '.join(intents)}"
+
+    def _execute_tool(
+        self, intent: str, context: ProductContext, market_trends: dict, tools: Optional[dict] = None
+    ) -> Optional[ToolResult]:
+        """Run the tool for a single intent."""
+        tool_fn = (tools or self._TOOLS).get(intent)
+        return tool_fn(context, market_trends) if tool_fn else None
+
+    def _finish(self, response: AgentResponse, step: AgentStep, market_trends: dict) -> None:
+        """Record the observation and synthesize the final answer."""
+        results = response.results
+
+        # Step 4: Observe
+        step.observation = "\n".join([
+            f"[{r.tool_name}] {r.explanation}" for r in results if r.success
+        ])
+
+        # Step 5: Synthesize final answer (with LLM if available)
+        if self.use_llm and self.llm:
+            response.final_answer = self._synthesize_with_llm(response.query, results, market_trends)
+        else:
+            response.final_answer = self._synthesize_rule_based(results)
+
+    def run(self, query: str, context: ProductContext, tools: Optional[dict] = None) -> AgentResponse:
         """
         Execute the ReAct loop with LangChain and Gemini.
+        `tools` replaces the default tool table (same keys as _TOOLS).
         """
         response = AgentResponse(query=query, intent="")
 
@@ -827,41 +1370,19 @@ class ReactAgent:
             intents = self._classify_intent(query)
             response.intent = intents[0] if len(intents) == 1 else "multi"
 
-            if self.use_llm and self.llm:
-                thought = self._reason_with_llm(query, context, market_trends)
-            else:
-                thought = f"Processing query for tools: {', '.join(intents)}"
-
             step = AgentStep(
-                thought=thought,
+                thought=self._think(query, context, market_trends, intents),
                 action="execute_tools",
                 action_input={"tools": intents}
             )
             response.steps.append(step)
 
-            # Step 3: Execute tools
-            results = []
-            for intent in intents:
-                if intent == "demand_forecast":
-                    results.append(demand_forecast_tool(context, market_trends))
-                elif intent == "smart_reorder":
-                    results.append(smart_reorder_tool(context, market_trends))
-                elif intent == "pricelist_optimize":
-                    results.append(pricelist_optimize_tool(context, market_trends))
-
-            response.results = results
-
-            # Step 4: Observe
-            observation = "\n".join([
-                f"[{r.tool_name}] {r.explanation}" for r in results if r.success
-            ])
-            step.observation = observation
+            # Step 3: Execute tools. They are pure Python and hold the GIL, so
+            # running them in threads only adds overhead
+            results = [self._execute_tool(intent, context, market_trends, tools) for intent in intents]
+            response.results = [r for r in results if r is not None]
 
-            # Step 5: Synthesize final answer (with LLM if available)
-            if self.use_llm and self.llm:
-                response.final_answer = self._synthesize_with_llm(query, results, market_trends)
-            else:
-                response.final_answer = self._synthesize_rule_based(results)
+            self._finish(response, step, market_trends)
 
         except Exception as e:
             response.errors.append(str(e))
@@ -869,17 +1390,59 @@ class ReactAgent:
 
         return response
 
-    def run_single_tool(self, tool_name: str, context: ProductContext) -> ToolResult:
-        """Run a single tool directly."""
-        market_trends = self._fetch_market_trends(context)
+    async def arun(self, query: str, context: ProductContext, executor: Optional[Executor] = None) -> AgentResponse:
+        """
+        Async variant of run() for the API server.
 
-        if tool_name == "demand_forecast":
-            return demand_forecast_tool(context, market_trends)
-        elif tool_name == "smart_reorder":
-            return smart_reorder_tool(context, market_trends)
-        elif tool_name == "pricelist_optimize":
-            return pricelist_optimize_tool(context, market_trends)
-        else:
+        Scraping uses the scraper's async client; blocking work (LLM calls,
+        tools) runs in `executor`. The reasoning call and the selected tools
+        don't depend on each other, so they are awaited together and the step
+        costs max() instead of sum().
+        """
+        loop = asyncio.get_running_loop()
+        response = AgentResponse(query=query, intent="")
+
+        try:
+            # Step 1: Fetch market trends via web scraping
+            market_trends = await self._afetch_market_trends(context)
+            response.market_trends = market_trends
+
+            intents = self._classify_intent(query)
+            response.intent = intents[0] if len(intents) == 1 else "multi"
+
+            # Steps 2-3: Reason and execute tools concurrently
+            thought, *results = await asyncio.gather(
+                loop.run_in_executor(executor, self._think, query, context, market_trends, intents),
+                *(
+                    loop.run_in_executor(executor, self._execute_tool, intent, context, market_trends)
+                    for intent in intents
+                ),
+            )
+            step = AgentStep(
+                thought=thought,
+                action="execute_tools",
+                action_input={"tools": intents}
+            )
+            response.steps.append(step)
+            response.results = [r for r in results if r is not None]
+
+            await loop.run_in_executor(executor, self._finish, response, step, market_trends)
+
+        except Exception as e:
+            response.errors.append(str(e))
+            response.final_answer = f"Error: {str(e)}"
+
+        return response
+
+    def run_single_tool(
+        self, tool_name: str, context: ProductContext, market_trends: Optional[dict] = None
+    ) -> ToolResult:
+        """
+        Run a single tool directly.
+        Pass `market_trends` to reuse an earlier fetch instead of scraping again.
+        """
+        tool_fn = self._TOOLS.get(tool_name)
+        if tool_fn is None:
             return ToolResult(
                 tool_name=tool_name,
                 success=False,
@@ -888,6 +1451,15 @@ class ReactAgent:
                 error=f"Unknown tool: {tool_name}"
             )
 
+        if market_trends is None:
+            market_trends = self._fetch_market_trends(context)
+        return tool_fn(context, market_trends)
+
+    def run_tools_batch(self, tool_names: list[str], context: ProductContext) -> list[ToolResult]:
+        """Run several tools for one product, fetching market trends only once."""
+        market_trends = self._fetch_market_trends(context)
+        return [self.run_single_tool(name, context, market_trends) for name in tool_names]
+
 
 # =============================================================================
 # Convenience Functions
@@ -898,30 +1470,64 @@ def create_agent(use_llm: bool = True, api_key: str = None) -> ReactAgent:
     return ReactAgent(use_llm=use_llm, api_key=api_key)
 
 
+# Shared agent for process_request, built once per process so the scraper
+# HTTP clients and Gemini client are reused across requests.
+_DEFAULT_AGENT: Optional[ReactAgent] = None
+
+
+def _get_default_agent() -> ReactAgent:
+    """Return the process-wide agent, creating it on first use."""
+    global _DEFAULT_AGENT
+    if _DEFAULT_AGENT is None:
+        _DEFAULT_AGENT = create_agent()
+    return _DEFAULT_AGENT
+
+
 def process_request(query: str, product_data: dict) -> dict:
     """
     Process a request from Go backend.
     """
-    agent = create_agent()
-
-    context = ProductContext(
-        product_id=product_data.get("product_id", ""),
-        product_name=product_data.get("product_name"),
-        product_description=product_data.get("product_description"),
-        category=product_data.get("category"),
-        shop_country=product_data.get("shop_country"),
-        sales_history=product_data.get("sales_history"),
-        history_months=product_data.get("history_months", 6),
-        current_stock=product_data.get("current_stock"),
-        safety_stock=product_data.get("safety_stock"),
-        lead_time_days=product_data.get("lead_time_days"),
-        days_in_inventory=product_data.get("days_in_inventory"),
-        current_price=product_data.get("current_price"),
-        cost=product_data.get("cost"),
-    )
+    agent = _get_default_agent()
+    response = agent.run(query, _context_from_product_data(product_data))
+    return _response_to_dict(response)
+
+
+def process_requests_batch(queries: list[str], products: list[dict]) -> list[dict]:
+    """
+    Process several requests from Go backend in one call.
+    Demand forecast statistics for all products are computed together;
+    each result matches what process_request returns for that pair.
+    Call warm_up_batch_forecast() at startup to compile the Numba kernel
+    before the first batch.
+    """
+    if len(queries) != len(products):
+        raise ValueError("queries and products must have the same length")
+
+    agent = _get_default_agent()
+    contexts = [_context_from_product_data(product_data) for product_data in products]
+
+    stats = _forecast_stats_batch([ctx.sales_history for ctx in contexts])
+
+    responses = []
+    for query, ctx, forecast_stats in zip(queries, contexts, stats):
+        tools = {
+            **ReactAgent._TOOLS,
+            "demand_forecast": partial(demand_forecast_tool, forecast_stats=forecast_stats),
+        }
+        responses.append(_response_to_dict(agent.run(query, ctx, tools)))
+    return responses
+
+
+def _context_from_product_data(product_data: dict) -> ProductContext:
+    """Build a ProductContext from a Go backend product payload."""
+    # Missing keys fall back to the dataclass defaults; unknown keys are ignored
+    context_fields = {k: product_data[k] for k in PRODUCT_CONTEXT_FIELDS if k in product_data}
+    context_fields.setdefault("product_id", "")
+    return ProductContext(**context_fields)
 
-    response = agent.run(query, context)
 
+def _response_to_dict(response: AgentResponse) -> dict:
+    """Convert an AgentResponse into the dict shape returned to Go backend."""
     return {
         "query": response.query,
         "intent": response.intent,